@@ -6,29 +6,94 @@ FastAPI server with WebSocket support for real-time crawling monitoring
 """
 
 import asyncio
-import json
+import atexit
+import logging
+import queue
 import sys
 import os
 import time
 from typing import Dict, Any, Optional, List, Set
 from contextlib import asynccontextmanager
-from collections import deque  # 引入双端队列用于限制日志长度
-from datetime import datetime
+from dataclasses import dataclass
+from collections import OrderedDict
+from datetime import date as date_type, datetime
+from logging.handlers import QueueHandler, QueueListener
+import orjson
 import uvicorn
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException, BackgroundTasks
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 import redis.asyncio as redis
 
+# uvloop / httptools 为可选依赖（uvloop 不支持 Windows），缺失时回退到标准实现
+try:
+    import uvloop  # noqa: F401
+    UVLOOP_AVAILABLE = True
+except ImportError:
+    UVLOOP_AVAILABLE = False
+
+try:
+    import httptools  # noqa: F401
+    HTTPTOOLS_AVAILABLE = True
+except ImportError:
+    HTTPTOOLS_AVAILABLE = False
+
 # Add parent directory to Python path to import MediaCrawler modules
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 # from cmd_arg import ArgumentParser
-from config import base_config
 from base.base_crawler import AbstractCrawler
 from media_platform.xhs import XiaoHongShuCrawler
-from store import xhs as xhs_store
-from var import crawler_type_var
+from var import NoteStoreFunc, crawler_type_var, note_update_callback_var
+
+
+def _init_logger():
+    """服务端日志经队列交由后台线程写出，避免同步 I/O 阻塞事件循环"""
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(logging.Formatter(
+        "%(asctime)s %(name)s %(levelname)s - %(message)s",
+        datefmt='%Y-%m-%d %H:%M:%S'
+    ))
+    _logger = logging.getLogger(__name__)
+    _logger.setLevel(logging.INFO)
+    _logger.addHandler(QueueHandler(log_queue))
+    _logger.propagate = False
+    # 导入模块即启动监听线程（测试等不经过 lifespan 的场景同样会写出日志），退出时写完剩余记录
+    listener = QueueListener(log_queue, stream_handler)
+    listener.start()
+    atexit.register(listener.stop)
+    return _logger, listener
+
+
+logger, log_listener = _init_logger()
+
+# 日志合并发送：在该时间窗口内产生的日志合并为一帧
+LOG_FLUSH_INTERVAL = 0.02
+LOG_FLUSH_MAX_BATCH = 200
+# 每个会话日志缓冲区的上限（字节），超出后从头部按块截断
+LOG_BUFFER_MAX_BYTES = 256 * 1024
+# 每次截断额外多丢弃上限的 1/N，避免每次追加都移动整个缓冲区
+LOG_BUFFER_TRIM_DIVISOR = 8
+# 统计数据推送的最小间隔（秒），计数变化在此间隔内合并为一次推送
+STATS_FLUSH_INTERVAL = 0.25
+# Redis 中保留的历史会话条数
+CRAWL_HISTORY_KEY = "crawl_history"
+CRAWL_HISTORY_MAX_LEN = 100
+# 内存中保留的最大会话数，超出后按 LRU 淘汰已结束的会话
+MAX_SESSIONS = 512
+
+
+def _dumps(obj: Any) -> bytes:
+    """序列化为 UTF-8 JSON bytes（orjson 默认不转义非 ASCII 字符）"""
+    return orjson.dumps(obj)
+
+
+# 固定的控制消息，预先编码
+PONG = b"pong"
+# 统计帧模板中计数的占位符，序列化后替换为实际计数
+_STATS_COUNT_PLACEHOLDER = "__crawled_count__"
+_STATS_COUNT_PLACEHOLDER_JSON = _dumps(_STATS_COUNT_PLACEHOLDER)
 
 
 class CrawlRequest(BaseModel):
@@ -38,6 +103,19 @@ class CrawlRequest(BaseModel):
     session_id: Optional[str] = None  # 允许前端指定session_id
 
 
+@dataclass(frozen=True)
+class CrawlTaskConfig:
+    """单次爬取任务的配置快照，注入爬虫实例而非改写全局配置，支持并发任务"""
+    platform: str
+    keywords: str
+    max_notes_count: int
+    crawler_type: str = "search"
+
+    @classmethod
+    def from_request(cls, request: CrawlRequest) -> "CrawlTaskConfig":
+        return cls(platform=request.platform, keywords=request.keyword, max_notes_count=request.count)
+
+
 class CrawlResponse(BaseModel):
     success: bool
     message: str
@@ -46,9 +124,10 @@ class CrawlResponse(BaseModel):
 
 class SessionData:
     """会话数据，状态与连接分离"""
-    def __init__(self, max_logs=500):
-        # 使用 deque 限制最大日志条数，防止内存溢出
-        self.logs: deque = deque(maxlen=max_logs)
+    def __init__(self, max_log_bytes=LOG_BUFFER_MAX_BYTES):
+        # 日志以换行分隔的 UTF-8 bytes 连续存放，限制总字节数防止内存溢出，回放时无需再编码
+        self.logs: bytearray = bytearray()
+        self.max_log_bytes: int = max_log_bytes
         self.crawled_count: int = 0
         self.is_running: bool = False
         # 支持同一会话下多个 WebSocket 连接（多标签页监控）
@@ -60,13 +139,85 @@ class SessionData:
         self.keyword: str = ""
         self.platform: str = ""
         self.request_count: int = 0
+        # 预先计算的筛选键，避免历史查询时逐条转换
+        self.start_date: Optional[date_type] = None
+        self.keyword_lower: str = ""
+        # 摘要是否已写入 Redis 历史列表
+        self.persisted: bool = False
+        # 待发送日志队列及后台合并发送任务
+        self.log_queue: asyncio.Queue[bytes] = asyncio.Queue()
+        self.flusher_task: Optional[asyncio.Task] = None
+        # 已写入 logs 但尚未推送给连接的日志字节数（含 flusher 正在合并的批次）
+        self.pending_log_bytes: int = 0
+        # 统计数据限频推送：计数变化只标记为脏，由 flusher 按间隔发送
+        self.stats_dirty: bool = False
+        self.last_stats_sent: float = 0.0
+        # 计数变化时唤醒空闲的 flusher（此时它可能正无限期等待日志）
+        self.stats_event: asyncio.Event = asyncio.Event()
+        # 统计帧模板：按 (is_running, start_time, error_message) 缓存计数两侧的 bytes，计数变化时只拼接
+        self.stats_template_key: Optional[tuple] = None
+        self.stats_template: tuple = (b"", b"")
+        # 最近一次生成的统计帧，状态未变化时（如重连）直接复用
+        self.stats_key: Optional[tuple] = None
+        self.stats_payload: bytes = b""
+
+    def append_log(self, data: bytes):
+        """追加一条日志，超出上限时从头部按整行截断，最新一行始终保留"""
+        self.logs += data
+        self.logs += b"\n"
+        excess = len(self.logs) - self.max_log_bytes
+        if excess > 0:
+            # 多截断上限的一小部分；只在最新一行之前查找切分点
+            newest = len(self.logs) - len(data) - 1
+            cut = self.logs.find(b"\n", excess + self.max_log_bytes // LOG_BUFFER_TRIM_DIVISOR, newest)
+            del self.logs[:newest if cut == -1 else cut + 1]
+
+    def get_history_payload(self) -> bytes:
+        """已推送过的历史日志（不含尚在发送队列中的部分），去掉末尾换行"""
+        end = len(self.logs) - self.pending_log_bytes - 1
+        if end <= 0:
+            return b""
+        with memoryview(self.logs) as view:
+            return bytes(view[:end])
+
+    def get_stats_payload(self) -> bytes:
+        """获取统计数据帧，仅在状态变化时重新序列化，计数变化只拼接模板"""
+        template_key = (self.is_running, self.start_time, self.error_message)
+        if template_key != self.stats_template_key:
+            payload = _dumps({
+                "type": "stats",
+                "crawled_count": _STATS_COUNT_PLACEHOLDER,
+                "status": "running" if self.is_running else "stopped",
+                "start_time": self.start_time,
+                "error_message": self.error_message
+            })
+            # crawled_count 位于 error_message 之前，首个匹配即为占位符
+            prefix, _, suffix = payload.partition(_STATS_COUNT_PLACEHOLDER_JSON)
+            self.stats_template = (prefix, suffix)
+            self.stats_template_key = template_key
+            self.stats_key = None
+
+        key = (self.crawled_count, template_key)
+        if key != self.stats_key:
+            prefix, suffix = self.stats_template
+            self.stats_payload = b"%s%d%s" % (prefix, self.crawled_count, suffix)
+            self.stats_key = key
+        return self.stats_payload
 
 
 class SessionManager:
     """优化的会话管理器：状态与连接分离"""
     def __init__(self):
-        self.sessions: Dict[str, SessionData] = {}
+        # 按最近访问顺序排列，用于 LRU 淘汰
+        self.sessions: OrderedDict[str, SessionData] = OrderedDict()
         self.redis_client: Optional[redis.Redis] = None
+        # 历史查询的二级索引：平台 / 日期 -> session_id 集合
+        self.by_platform: Dict[str, Set[str]] = {}
+        self.by_date: Dict[date_type, Set[str]] = {}
+        # 所有会话的活跃连接总数，随连接增减维护，供 /api/stats 直接读取
+        self.total_active_sockets: int = 0
+        # 持有后台任务的引用，防止被垃圾回收
+        self._background_tasks: Set[asyncio.Task] = set()
 
     async def init_redis(self):
         """Initialize Redis connection for caching"""
@@ -78,101 +229,251 @@ class SessionManager:
                 socket_connect_timeout=5
             )
             await self.redis_client.ping()
-            print("✅ Redis connected successfully")
+            logger.info("✅ Redis connected successfully")
         except Exception as e:
-            print(f"⚠️ Redis connection failed: {e}")
+            logger.warning(f"⚠️ Redis connection failed: {e}")
             self.redis_client = None
 
+    @staticmethod
+    def session_summary(session_id: str, session: SessionData) -> Dict[str, Any]:
+        """会话摘要，用于历史列表与 Redis 持久化"""
+        return {
+            "session_id": session_id,
+            "keyword": session.keyword,
+            "platform": session.platform,
+            "start_time": session.start_time,
+            "end_time": session.end_time,
+            "crawled_count": session.crawled_count,
+            "status": "running" if session.is_running else "stopped",
+            "error_message": session.error_message,
+        }
+
+    async def _persist_summaries(self, summaries: List[Dict[str, Any]]) -> bool:
+        """将会话摘要写入 Redis 历史列表，所有写入通过一个 pipeline 一次往返完成；返回是否写入成功"""
+        if not self.redis_client or not summaries:
+            return False
+        try:
+            async with self.redis_client.pipeline(transaction=False) as pipe:
+                pipe.lpush(CRAWL_HISTORY_KEY, *(_dumps(summary) for summary in summaries))
+                pipe.ltrim(CRAWL_HISTORY_KEY, 0, CRAWL_HISTORY_MAX_LEN - 1)
+                await pipe.execute()
+        except Exception as e:
+            logger.warning(f"⚠️ Failed to persist sessions to Redis: {e}")
+            return False
+        return True
+
+    async def persist_sessions(self, session_ids: List[str]):
+        """批量将会话摘要写入 Redis 历史列表"""
+        if not self.redis_client:
+            return
+        summaries = []
+        written = []
+        for session_id in session_ids:
+            session = self.sessions.get(session_id)
+            if session is not None:
+                summaries.append(self.session_summary(session_id, session))
+                written.append((session, session.start_time))
+        # 仅在写入成功后标记，失败的会话在淘汰时会再次尝试写入
+        if await self._persist_summaries(summaries):
+            for session, start_time in written:
+                # 写入期间会话可能已开始新一轮任务，此时不应标记
+                if session.start_time == start_time:
+                    session.persisted = True
+
+    async def persist_session(self, session_id: str):
+        """将单个会话摘要写入 Redis 历史列表"""
+        await self.persist_sessions([session_id])
+
+    def index_session(self, session_id: str, session: SessionData):
+        """将会话加入平台 / 日期索引"""
+        if session.platform:
+            self.by_platform.setdefault(session.platform, set()).add(session_id)
+        if session.start_date:
+            self.by_date.setdefault(session.start_date, set()).add(session_id)
+
+    def unindex_session(self, session_id: str, session: SessionData):
+        """将会话移出平台 / 日期索引，空集合一并删除"""
+        for index, key in ((self.by_platform, session.platform), (self.by_date, session.start_date)):
+            session_ids = index.get(key)
+            if session_ids is not None:
+                session_ids.discard(session_id)
+                if not session_ids:
+                    del index[key]
+
     def get_session(self, session_id: str) -> SessionData:
         """获取或创建会话"""
         if session_id not in self.sessions:
             self.sessions[session_id] = SessionData()
-            print(f"🆕 Created new session: {session_id}")
+            logger.info(f"🆕 Created new session: {session_id}")
+            self._evict_sessions(keep=session_id)
+        else:
+            self.sessions.move_to_end(session_id)
         return self.sessions[session_id]
 
+    def _evict_sessions(self, keep: str):
+        """会话数超过上限时，从最久未访问的开始淘汰已结束且无连接的会话（keep 为刚创建的会话）"""
+        overflow = len(self.sessions) - MAX_SESSIONS
+        if overflow <= 0:
+            return
+        evicted = []
+        for session_id, session in self.sessions.items():
+            if session_id == keep or session.is_running or session.active_sockets:
+                continue
+            evicted.append(session_id)
+            if len(evicted) >= overflow:
+                break
+
+        summaries = []
+        for session_id in evicted:
+            session = self.sessions.pop(session_id)
+            self.unindex_session(session_id, session)
+            self._stop_flusher(session)
+            if not session.persisted and session.start_time is not None:
+                summaries.append(self.session_summary(session_id, session))
+        if evicted:
+            logger.info(f"🧹 Evicted {len(evicted)} finished sessions")
+
+        # 未持久化的会话摘要在淘汰前写入 Redis
+        if summaries and self.redis_client:
+            task = asyncio.create_task(self._persist_summaries(summaries))
+            self._background_tasks.add(task)
+            task.add_done_callback(self._background_tasks.discard)
+
     async def connect(self, session_id: str, websocket: WebSocket):
         """WebSocket连接 - 断点续传"""
         await websocket.accept()
         session = self.get_session(session_id)
-        session.active_sockets.add(websocket)
-        print(f"🔌 WebSocket connected for session: {session_id}")
+        self._add_socket(session, websocket)
+        self._ensure_flusher(session_id, session)
+        logger.info(f"🔌 WebSocket connected for session: {session_id}")
 
         # 1. 立即发送最近的历史日志 (断点续传体验)
-        if session.logs:
+        # 尚在队列中的日志稍后会由 flusher 推送给包括本连接在内的所有连接，这里跳过以免重复
+        history = session.get_history_payload()
+        if history:
             # 合并发送历史日志以减少网络开销
-            history_logs = "\n".join(session.logs)
-            await websocket.send_text(history_logs)
-            print(f"📜 Sent {len(session.logs)} historical logs")
+            await websocket.send_bytes(history)
+            logger.info(f"📜 Sent {len(history)} bytes of historical logs")
 
         # 2. 发送当前状态
         await self.send_stat_update(session_id)
-        print(f"📊 Sent current status for session: {session_id}")
+        logger.info(f"📊 Sent current status for session: {session_id}")
 
     def disconnect(self, session_id: str, websocket: WebSocket):
         """WebSocket断开 - 保留状态，只移除当前连接"""
-        if session_id in self.sessions:
-            session = self.sessions[session_id]
-            if websocket in session.active_sockets:
-                session.active_sockets.discard(websocket)
-            print(f"🔌 WebSocket disconnected for session: {session_id}")
+        session = self.sessions.get(session_id)
+        if session is not None:
+            self._remove_socket(session, websocket)
+            if not session.active_sockets:
+                self._stop_flusher(session)
+            logger.info(f"🔌 WebSocket disconnected for session: {session_id}")
+
+    def _add_socket(self, session: SessionData, websocket: WebSocket):
+        """登记连接并维护连接总数"""
+        if websocket not in session.active_sockets:
+            session.active_sockets.add(websocket)
+            self.total_active_sockets += 1
+
+    def _remove_socket(self, session: SessionData, websocket: WebSocket):
+        """移除连接并维护连接总数"""
+        if websocket in session.active_sockets:
+            session.active_sockets.discard(websocket)
+            self.total_active_sockets -= 1
+
+    def _ensure_flusher(self, session_id: str, session: SessionData):
+        """确保会话的日志合并发送任务在运行"""
+        if session.flusher_task is None or session.flusher_task.done():
+            session.flusher_task = asyncio.create_task(self._flush_loop(session_id, session))
+
+    def _stop_flusher(self, session: SessionData):
+        """停止日志合并发送任务，丢弃未发送的日志（它们仍保留在 logs 中供重连回放）"""
+        if session.flusher_task is not None:
+            session.flusher_task.cancel()
+            session.flusher_task = None
+        session.log_queue = asyncio.Queue()
+        session.pending_log_bytes = 0
+
+    async def _flush_loop(self, session_id: str, session: SessionData):
+        """后台任务：将短时间窗口内的日志合并为一帧发送，并限频推送统计数据"""
+        log_queue = session.log_queue
+        while True:
+            if session.stats_dirty:
+                # 有待推送的统计数据时不能无限等待日志
+                try:
+                    first = await asyncio.wait_for(log_queue.get(), timeout=STATS_FLUSH_INTERVAL)
+                except asyncio.TimeoutError:
+                    first = None
+            else:
+                # 同时等待日志与 increment_count 的唤醒，无日志时计数也能及时推送
+                get_task = asyncio.ensure_future(log_queue.get())
+                wake_task = asyncio.ensure_future(session.stats_event.wait())
+                try:
+                    await asyncio.wait((get_task, wake_task), return_when=asyncio.FIRST_COMPLETED)
+                finally:
+                    wake_task.cancel()
+                    got_log = get_task.done()
+                    if not got_log:
+                        get_task.cancel()
+                first = get_task.result() if got_log else None
+
+            if first is not None:
+                batch = [first]
+                await asyncio.sleep(LOG_FLUSH_INTERVAL)
+                while len(batch) < LOG_FLUSH_MAX_BATCH and not log_queue.empty():
+                    batch.append(log_queue.get_nowait())
+
+                # 出队与选取目标连接在同一步内完成，与 connect 的历史回放保持一致
+                session.pending_log_bytes -= sum(len(data) + 1 for data in batch)
+                await self._broadcast(session_id, session, b"\n".join(batch), "message")
+
+            if session.stats_dirty and time.monotonic() - session.last_stats_sent >= STATS_FLUSH_INTERVAL:
+                await self.send_stat_update(session_id)
+
+    async def _broadcast(self, session_id: str, session: SessionData, payload: bytes, kind: str):
+        """并发向会话的所有连接发送同一帧，慢连接不会阻塞其他连接；payload 预先编码，避免每个连接重复编码"""
+        sockets = list(session.active_sockets)
+        results = await asyncio.gather(*(ws.send_bytes(payload) for ws in sockets), return_exceptions=True)
+        removed = False
+        for ws, result in zip(sockets, results):
+            if isinstance(result, Exception):
+                # 连接已断开，移除失效的 socket
+                logger.warning(f"⚠️ Failed to send {kind} to {session_id}: {result}")
+                self._remove_socket(session, ws)
+                removed = True
+        # 与 disconnect 一致：最后一个连接失效后停止 flusher
+        if removed and not session.active_sockets:
+            self._stop_flusher(session)
 
     async def safe_emit(self, session_id: str, message: str):
-        """安全发送日志文本"""
+        """安全发送日志文本（入队后由 flusher 合并发送，不阻塞调用方）"""
         session = self.get_session(session_id)
-        session.logs.append(message)  # 自动丢弃最旧的日志
+        data = message.encode("utf-8")
+        session.append_log(data)  # 超出上限时自动丢弃最旧的日志
 
-        # 向所有活跃连接广播日志
+        # 仅在有活跃连接时入队，由 flusher 统一广播
         if session.active_sockets:
-            dead_sockets = []
-            for ws in list(session.active_sockets):
-                try:
-                    await ws.send_text(message)
-                except Exception as e:
-                    # 连接已断开，移除失效的 socket
-                    print(f"⚠️ Failed to send message to {session_id}: {e}")
-                    dead_sockets.append(ws)
-            for ws in dead_sockets:
-                session.active_sockets.discard(ws)
+            session.log_queue.put_nowait(data)
+            session.pending_log_bytes += len(data) + 1
 
     async def send_stat_update(self, session_id: str):
         """发送结构化统计数据"""
         session = self.get_session(session_id)
+        session.stats_dirty = False
+        session.stats_event.clear()
+        session.last_stats_sent = time.monotonic()
         if session.active_sockets:
-            payload = json.dumps({
-                "type": "stats",
-                "crawled_count": session.crawled_count,
-                "status": "running" if session.is_running else "stopped",
-                "start_time": session.start_time,
-                "error_message": session.error_message
-            }, ensure_ascii=False)
-            dead_sockets = []
-            for ws in list(session.active_sockets):
-                try:
-                    await ws.send_text(payload)
-                except Exception as e:
-                    print(f"⚠️ Failed to send stats to {session_id}: {e}")
-                    dead_sockets.append(ws)
-            for ws in dead_sockets:
-                session.active_sockets.discard(ws)
+            await self._broadcast(session_id, session, session.get_stats_payload(), "stats")
 
     async def send_data_update(self, session_id: str, data_item: dict):
         """发送实时数据更新"""
         session = self.get_session(session_id)
         if session.active_sockets:
-            message = json.dumps({
+            message = _dumps({
                 "type": "data",
                 "data": data_item,
                 "status": "success"
-            }, ensure_ascii=False)
-            dead_sockets = []
-            for ws in list(session.active_sockets):
-                try:
-                    await ws.send_text(message)
-                except Exception as e:
-                    print(f"⚠️ Failed to send data to {session_id}: {e}")
-                    dead_sockets.append(ws)
-            for ws in dead_sockets:
-                session.active_sockets.discard(ws)
+            })
+            await self._broadcast(session_id, session, message, "data")
 
     async def set_status(self, session_id: str, is_running: bool, error_message: str = None):
         """更新会话状态"""
@@ -181,15 +482,19 @@ class SessionManager:
         session.error_message = error_message
 
         if not is_running:
-            session.end_time = asyncio.get_event_loop().time()
+            # 与 start_time 使用同一时钟（墙上时间），便于展示与计算耗时
+            session.end_time = time.time()
 
         await self.send_stat_update(session_id)
 
     async def increment_count(self, session_id: str):
-        """增加爬取计数"""
+        """增加爬取计数（统计数据由 flusher 限频推送）"""
         session = self.get_session(session_id)
         session.crawled_count += 1
-        await self.send_stat_update(session_id)
+        # 无人监听时只计数；新连接建立时 connect 会发送最新统计
+        if session.active_sockets:
+            session.stats_dirty = True
+            session.stats_event.set()
 
     # 兼容旧接口
     async def send_personal_message(self, message: Dict[str, Any], session_id: str):
@@ -212,6 +517,8 @@ async def lifespan(app: FastAPI):
     await manager.init_redis()
     yield
     # Cleanup
+    for session in manager.sessions.values():
+        manager._stop_flusher(session)
     if manager.redis_client:
         await manager.redis_client.close()
 
@@ -246,25 +553,22 @@ async def start_crawl(request: CrawlRequest, background_tasks: BackgroundTasks):
         import uuid
         session_id = request.session_id or str(uuid.uuid4())
 
-        # Update global configuration
-        base_config.KEYWORDS = request.keyword
-        base_config.CRAWLER_MAX_NOTES_COUNT = request.count
-        base_config.PLATFORM = request.platform
-        base_config.CRAWLER_TYPE = "search"
+        # 任务配置快照，随任务传递，不修改全局配置
+        task_config = CrawlTaskConfig.from_request(request)
 
         # Try to create crawler instance first to test
         try:
-            print(f"📋 Testing crawler creation for platform: {request.platform}")
+            logger.info(f"📋 Testing crawler creation for platform: {request.platform}")
             crawler_factory = CrawlerFactory()
-            test_crawler = crawler_factory.create_crawler(request.platform)
-            print(f"✅ Test crawler created successfully: {type(test_crawler)}")
+            test_crawler = crawler_factory.create_crawler(task_config)
+            logger.info(f"✅ Test crawler created successfully: {type(test_crawler)}")
         except Exception as e:
-            print(f"❌ Failed to create crawler: {e}")
+            logger.error(f"❌ Failed to create crawler: {e}")
             raise HTTPException(status_code=500, detail=f"Crawler creation failed: {str(e)}")
 
         # 使用 BackgroundTasks 提交任务，API 立即返回成功
-        background_tasks.add_task(run_crawler_task, session_id, request)
-        print(f"✅ Crawler task scheduled for session: {session_id}")
+        background_tasks.add_task(run_crawler_task, session_id, request, task_config)
+        logger.info(f"✅ Crawler task scheduled for session: {session_id}")
 
         return CrawlResponse(
             success=True,
@@ -279,17 +583,21 @@ async def start_crawl(request: CrawlRequest, background_tasks: BackgroundTasks):
 @app.websocket("/ws/logs/{session_id}")
 async def websocket_endpoint(websocket: WebSocket, session_id: str):
     """WebSocket endpoint for real-time log updates - 支持断点续传"""
-    await manager.connect(session_id, websocket)
     try:
+        # connect 发送历史日志时客户端也可能断开，需一并纳入清理范围
+        await manager.connect(session_id, websocket)
         while True:
             # 保持连接活跃，也可以在这里接收前端的控制指令
             data = await websocket.receive_text()
             if data == "ping":
-                await websocket.send_text("pong")
+                await websocket.send_bytes(PONG)
             elif data == "stop":
                 # 可以处理停止指令
                 await manager.set_status(session_id, False, "用户手动停止")
     except WebSocketDisconnect:
+        pass
+    finally:
+        # 无论以何种方式退出都要移除连接，避免失效 socket 残留在会话中
         manager.disconnect(session_id, websocket)
 
 
@@ -308,7 +616,7 @@ async def get_sessions_history(
     summary_list: List[Dict[str, Any]] = []
 
     # 解析日期筛选参数
-    target_date: Optional[datetime.date] = None
+    target_date: Optional[date_type] = None
     if date:
         try:
             target_date = datetime.strptime(date, "%Y-%m-%d").date()
@@ -317,26 +625,26 @@ async def get_sessions_history(
 
     query = (q or "").strip().lower()
 
-    for session_id, session in manager.sessions.items():
-        keyword = getattr(session, "keyword", "") or ""
-        platform_value = getattr(session, "platform", "") or ""
-        start_time = getattr(session, "start_time", None)
-
-        # 1. 关键词模糊搜索（仅对 keyword）
-        if query:
-            if query not in keyword.lower():
-                continue
-
-        # 2. 平台精确筛选
-        if platform and platform != "all" and platform_value != platform:
+    # 1. 平台 / 日期筛选：先求索引交集，只扫描命中的会话
+    candidates: Optional[Set[str]] = None
+    if platform and platform != "all":
+        candidates = manager.by_platform.get(platform, set())
+    if target_date:
+        date_ids = manager.by_date.get(target_date, set())
+        candidates = date_ids if candidates is None else candidates & date_ids
+    session_ids = manager.sessions.keys() if candidates is None else list(candidates)
+
+    for session_id in session_ids:
+        session = manager.sessions.get(session_id)
+        if session is None:
             continue
+        keyword = session.keyword
+        platform_value = session.platform
+        start_time = session.start_time
 
-        # 3. 日期筛选（基于 start_time 时间戳）
-        if target_date:
-            if not start_time:
-                continue
-            session_date = datetime.fromtimestamp(start_time).date()
-            if session_date != target_date:
+        # 2. 关键词模糊搜索（仅对 keyword）
+        if query:
+            if query not in session.keyword_lower:
                 continue
 
         summary_list.append(
@@ -356,7 +664,7 @@ async def get_sessions_history(
     return {"total": len(summary_list), "sessions": summary_list}
 
 
-async def run_crawler_task(session_id: str, request: CrawlRequest):
+async def run_crawler_task(session_id: str, request: CrawlRequest, task_config: CrawlTaskConfig):
     """优化版爬虫任务：状态与连接分离"""
     session = manager.get_session(session_id)
 
@@ -364,17 +672,23 @@ async def run_crawler_task(session_id: str, request: CrawlRequest):
         await manager.safe_emit(session_id, "⚠️ 任务已经在运行中，请勿重复启动。")
         return
 
-    # 初始化会话状态
+    # 初始化会话状态（元数据变化前先移出旧索引）
+    manager.unindex_session(session_id, session)
     session.is_running = True
     session.crawled_count = 0
     # 使用真实时间戳，便于前端展示
     session.start_time = time.time()
+    session.end_time = None
+    session.start_date = datetime.fromtimestamp(session.start_time).date()
     session.error_message = None
+    session.persisted = False  # 新一轮任务的摘要尚未写入
     session.logs.clear()  # 新任务开始清空旧日志
     # 保存请求元数据，供历史接口使用
     session.keyword = request.keyword
+    session.keyword_lower = request.keyword.lower()
     session.platform = request.platform
     session.request_count = request.count
+    manager.index_session(session_id, session)
 
     await manager.safe_emit(session_id, f"🚀 任务启动: {request.platform} - {request.keyword}")
 
@@ -402,7 +716,7 @@ async def run_crawler_task(session_id: str, request: CrawlRequest):
 
         # 创建爬虫实例
         crawler_factory = CrawlerFactory()
-        crawler: AbstractCrawler = crawler_factory.create_crawler(request.platform)
+        crawler: AbstractCrawler = crawler_factory.create_crawler(task_config)
 
         await manager.safe_emit(session_id, f"✅ 爬虫实例创建成功: {type(crawler).__name__}")
 
@@ -410,29 +724,25 @@ async def run_crawler_task(session_id: str, request: CrawlRequest):
         if isinstance(crawler, XiaoHongShuCrawler):
             await manager.safe_emit(session_id, "🔧 配置小红书爬虫实时数据流...")
 
-            # 保存原始函数
-            original_update_xhs_note = xhs_store.update_xhs_note
-
-            # 优化的WebSocket数据发送函数
-            async def update_xhs_note_with_websocket(note_item: Dict[str, Any]):
-                # 立即发送实时数据
+            # 先推送实时数据，再执行存储
+            async def on_note_update(note_item: Dict[str, Any], store_note: NoteStoreFunc):
                 await on_crawler_update(
                     f"📝 笔记 {note_item.get('note_id', 'N/A')} 数据获取成功",
                     data_item=note_item
                 )
 
-                # 异步执行原始存储操作，不阻塞爬虫
+                # 单条存储失败只提示，不中断整个爬虫任务
                 try:
-                    await original_update_xhs_note(note_item)
+                    await store_note(note_item)
                 except Exception as e:
                     await manager.safe_emit(session_id, f"⚠️ 数据存储异常: {e}")
 
-            # 注入回调函数
-            xhs_store.update_xhs_note = update_xhs_note_with_websocket
+            # 通过 ContextVar 注入回调：仅对当前任务及其子任务生效，多个会话可并发运行
+            note_update_callback_token = note_update_callback_var.set(on_note_update)
 
             try:
                 # 设置爬虫类型
-                crawler_type_var.set("search")
+                crawler_type_var.set(task_config.crawler_type)
 
                 await manager.safe_emit(session_id, "🚀 启动浏览器和爬虫任务...")
                 await manager.set_status(session_id, True)
@@ -448,11 +758,9 @@ async def run_crawler_task(session_id: str, request: CrawlRequest):
             except Exception as e:
                 await manager.set_status(session_id, False, str(e))
                 await manager.safe_emit(session_id, f"❌ 爬虫执行异常: {str(e)}")
-                import traceback
-                traceback.print_exc()
+                logger.exception(f"Crawler failed for session: {session_id}")
             finally:
-                # 恢复原始函数
-                xhs_store.update_xhs_note = original_update_xhs_note
+                note_update_callback_var.reset(note_update_callback_token)
                 await manager.set_status(session_id, False)
 
         else:
@@ -460,16 +768,15 @@ async def run_crawler_task(session_id: str, request: CrawlRequest):
             await manager.safe_emit(session_id, f"🔄 启动 {request.platform} 平台爬虫...")
             await manager.set_status(session_id, True)
 
-            crawler_type_var.set("search")
+            crawler_type_var.set(task_config.crawler_type)
             await crawler.start()
 
             await manager.set_status(session_id, False)
             await manager.safe_emit(session_id, f"✅ {request.platform} 爬虫任务完成")
 
     except Exception as e:
-        import traceback
         error_msg = f"💥 任务异常停止: {str(e)}"
-        print(traceback.format_exc())
+        logger.exception(f"Crawler task aborted for session: {session_id}")
 
         await manager.set_status(session_id, False, error_msg)
         await manager.safe_emit(session_id, error_msg)
@@ -477,6 +784,7 @@ async def run_crawler_task(session_id: str, request: CrawlRequest):
     finally:
         await manager.safe_emit(session_id, "🏁 任务结束")
         await manager.send_stat_update(session_id)
+        await manager.persist_session(session_id)
 
 
 class CrawlerFactory:
@@ -487,11 +795,15 @@ class CrawlerFactory:
     }
 
     @staticmethod
-    def create_crawler(platform: str) -> AbstractCrawler:
-        crawler_class = CrawlerFactory.CRAWLERS.get(platform)
+    def create_crawler(task_config: CrawlTaskConfig) -> AbstractCrawler:
+        crawler_class = CrawlerFactory.CRAWLERS.get(task_config.platform)
         if not crawler_class:
-            raise ValueError(f"Unsupported platform: {platform}")
-        return crawler_class()
+            raise ValueError(f"Unsupported platform: {task_config.platform}")
+        return crawler_class(
+            keywords=task_config.keywords,
+            max_notes_count=task_config.max_notes_count,
+            crawler_type=task_config.crawler_type,
+        )
 
 
 @app.get("/api/crawl/history")
@@ -507,9 +819,9 @@ async def get_crawl_history():
 
         for session in sessions:
             try:
-                session_data = json.loads(session)
+                session_data = orjson.loads(session)
                 history.append(session_data)
-            except json.JSONDecodeError:
+            except orjson.JSONDecodeError:
                 continue
 
         return {"history": history}
@@ -523,7 +835,7 @@ async def get_stats():
     """Get crawler statistics"""
     try:
         stats = {
-            "active_connections": sum(len(session.active_sockets) for session in manager.sessions.values()),
+            "active_connections": manager.total_active_sockets,
             "total_sessions": len(manager.sessions),
             "platforms": list(CrawlerFactory.CRAWLERS.keys())
         }
@@ -538,5 +850,7 @@ if __name__ == "__main__":
         host="0.0.0.0",
         port=3450,
         reload=True,
-        log_level="info"
+        log_level="info",
+        loop="uvloop" if UVLOOP_AVAILABLE else "asyncio",
+        http="httptools" if HTTPTOOLS_AVAILABLE else "h11",
     )
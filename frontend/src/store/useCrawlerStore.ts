@@ -104,6 +104,8 @@ export const useCrawlerStore = create<CrawlerStore>((set) => ({
   },
 }));
 
+const textDecoder = new TextDecoder('utf-8');
+
 // WebSocket connection hook
 export const useWebSocketConnection = () => {
   const {
@@ -123,6 +125,8 @@ export const useWebSocketConnection = () => {
     try {
       const wsUrl = `ws://localhost:3450/ws/logs/${newSessionId}`;
       const ws = new WebSocket(wsUrl);
+      // 后端结构化消息以二进制帧（UTF-8 JSON bytes）发送
+      ws.binaryType = 'arraybuffer';
 
       ws.onopen = () => {
         console.log('✅ WebSocket connected');
@@ -133,9 +137,12 @@ export const useWebSocketConnection = () => {
       };
 
       ws.onmessage = (event) => {
+        const message: unknown =
+          event.data instanceof ArrayBuffer ? textDecoder.decode(event.data) : event.data;
+
         try {
           // 首先尝试解析为JSON，处理结构化消息
-          const data = JSON.parse(event.data);
+          const data = JSON.parse(message as string);
 
           switch (data.type) {
             case 'status':
@@ -173,16 +180,16 @@ export const useWebSocketConnection = () => {
           }
         } catch (error) {
           // JSON解析失败，说明是纯文本日志
-          if (typeof event.data === 'string') {
+          if (typeof message === 'string') {
             // 检查是否包含换行符，可能是历史日志批量发送
-            if (event.data.includes('\n')) {
-              const historyLines = event.data.split('\n').filter(line => line.trim());
+            if (message.includes('\n')) {
+              const historyLines = message.split('\n').filter(line => line.trim());
               addLogs(historyLines);
             } else {
-              addLog(event.data);
+              addLog(message);
             }
           } else {
-            console.error('❌ Unexpected WebSocket message type:', typeof event.data);
+            console.error('❌ Unexpected WebSocket message type:', typeof message);
           }
         }
       };
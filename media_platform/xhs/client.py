@@ -545,6 +545,7 @@ class XiaoHongShuClient(AbstractApiClient, ProxyRefreshMixin):
         callback: Optional[Callable] = None,
         xsec_token: str = "",
         xsec_source: str = "pc_feed",
+        max_notes_count: Optional[int] = None,
     ) -> List[Dict]:
         """
         获取指定用户下的所有发过的帖子，该方法会一直查找一个用户下的所有帖子信息
@@ -554,14 +555,17 @@ class XiaoHongShuClient(AbstractApiClient, ProxyRefreshMixin):
             callback: 一次分页爬取结束后的更新回调函数
             xsec_token: 验证token
             xsec_source: 渠道来源
+            max_notes_count: 最大爬取笔记数，默认取 config.CRAWLER_MAX_NOTES_COUNT
 
         Returns:
 
         """
+        if max_notes_count is None:
+            max_notes_count = config.CRAWLER_MAX_NOTES_COUNT
         result = []
         notes_has_more = True
         notes_cursor = ""
-        while notes_has_more and len(result) < config.CRAWLER_MAX_NOTES_COUNT:
+        while notes_has_more and len(result) < max_notes_count:
             notes_res = await self.get_notes_by_creator(
                 user_id, notes_cursor, xsec_token=xsec_token, xsec_source=xsec_source
             )
@@ -584,7 +588,7 @@ class XiaoHongShuClient(AbstractApiClient, ProxyRefreshMixin):
                 f"[XiaoHongShuClient.get_all_notes_by_creator] got user_id:{user_id} notes len : {len(notes)}"
             )
 
-            remaining = config.CRAWLER_MAX_NOTES_COUNT - len(result)
+            remaining = max_notes_count - len(result)
             if remaining <= 0:
                 break
 
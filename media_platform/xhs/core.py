@@ -55,7 +55,22 @@ class XiaoHongShuCrawler(AbstractCrawler):
     browser_context: BrowserContext
     cdp_manager: Optional[CDPBrowserManager]
 
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        keywords: Optional[str] = None,
+        max_notes_count: Optional[int] = None,
+        crawler_type: Optional[str] = None,
+    ) -> None:
+        """
+        Args:
+            keywords: 搜索关键词（英文逗号分隔），默认取 config.KEYWORDS
+            max_notes_count: 最大爬取笔记数，默认取 config.CRAWLER_MAX_NOTES_COUNT
+            crawler_type: 爬取类型，默认取 config.CRAWLER_TYPE
+        """
+        # 任务级配置：允许调用方（如 Web 控制台）为每个实例单独指定，避免并发任务改写全局配置
+        self.keywords = keywords if keywords is not None else config.KEYWORDS
+        self.max_notes_count = max_notes_count if max_notes_count is not None else config.CRAWLER_MAX_NOTES_COUNT
+        self.crawler_type = crawler_type if crawler_type is not None else config.CRAWLER_TYPE
         self.index_url = "https://www.xiaohongshu.com"
         # self.user_agent = utils.get_user_agent()
         self.user_agent = "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/126.0.0.0 Safari/537.36"
@@ -108,14 +123,14 @@ class XiaoHongShuCrawler(AbstractCrawler):
                 await login_obj.begin()
                 await self.xhs_client.update_cookies(browser_context=self.browser_context)
 
-            crawler_type_var.set(config.CRAWLER_TYPE)
-            if config.CRAWLER_TYPE == "search":
+            crawler_type_var.set(self.crawler_type)
+            if self.crawler_type == "search":
                 # Search for notes and retrieve their comment information.
                 await self.search()
-            elif config.CRAWLER_TYPE == "detail":
+            elif self.crawler_type == "detail":
                 # Get the information and comments of the specified post
                 await self.get_specified_notes()
-            elif config.CRAWLER_TYPE == "creator":
+            elif self.crawler_type == "creator":
                 # Get creator's information and their notes and comments
                 await self.get_creators_and_notes()
             else:
@@ -127,15 +142,15 @@ class XiaoHongShuCrawler(AbstractCrawler):
         """Search for notes and retrieve their comment information."""
         utils.logger.info("[XiaoHongShuCrawler.search] Begin search xiaohongshu keywords")
         xhs_limit_count = 20  # xhs limit page fixed value
-        if config.CRAWLER_MAX_NOTES_COUNT < xhs_limit_count:
-            config.CRAWLER_MAX_NOTES_COUNT = xhs_limit_count
+        if self.max_notes_count < xhs_limit_count:
+            self.max_notes_count = xhs_limit_count
         start_page = config.START_PAGE
-        for keyword in config.KEYWORDS.split(","):
+        for keyword in self.keywords.split(","):
             source_keyword_var.set(keyword)
             utils.logger.info(f"[XiaoHongShuCrawler.search] Current search keyword: {keyword}")
             page = 1
             search_id = get_search_id()
-            while (page - start_page + 1) * xhs_limit_count <= config.CRAWLER_MAX_NOTES_COUNT:
+            while (page - start_page + 1) * xhs_limit_count <= self.max_notes_count:
                 if page < start_page:
                     utils.logger.info(f"[XiaoHongShuCrawler.search] Skip page {page}")
                     page += 1
@@ -213,6 +228,7 @@ class XiaoHongShuCrawler(AbstractCrawler):
                 callback=self.fetch_creator_notes_detail,
                 xsec_token=creator_info.xsec_token,
                 xsec_source=creator_info.xsec_source,
+                max_notes_count=self.max_notes_count,
             )
 
             note_ids = []
@@ -24,7 +24,7 @@
 from typing import List
 
 import config
-from var import source_keyword_var
+from var import note_update_callback_var, source_keyword_var
 
 from .xhs_store_media import *
 from ._store_impl import *
@@ -83,6 +83,23 @@ async def update_xhs_note(note_item: Dict):
 
     Returns:
 
+    """
+    note_update_callback = note_update_callback_var.get()
+    if note_update_callback:
+        # 回调负责推送并调用实际存储（如 Web 控制台捕获存储异常，避免中断整个任务）
+        await note_update_callback(note_item, _store_xhs_note)
+    else:
+        await _store_xhs_note(note_item)
+
+
+async def _store_xhs_note(note_item: Dict):
+    """
+    整理小红书笔记字段并写入存储
+    Args:
+        note_item:
+
+    Returns:
+
     """
     note_id = note_item.get("note_id")
     user_info = note_item.get("user", {})
@@ -0,0 +1,207 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025 relakkes@gmail.com
+#
+# This file is part of MediaCrawler project.
+# Repository: https://github.com/NanmiCoder/MediaCrawler/blob/main/tests/test_dashboard_session.py
+# GitHub: https://github.com/NanmiCoder
+# Licensed under NON-COMMERCIAL LEARNING LICENSE 1.1
+#
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+"""
+Unit tests for dashboard session log replay and flushing
+"""
+
+import pytest
+import asyncio
+
+from backend import server
+from backend.server import SessionManager
+
+
+class FakeWebSocket:
+    """Minimal WebSocket stand-in that records binary frames"""
+
+    def __init__(self, fail: bool = False):
+        self.fail = fail
+        self.frames = []
+
+    async def accept(self):
+        pass
+
+    async def send_bytes(self, data: bytes):
+        if self.fail:
+            raise RuntimeError("connection closed")
+        self.frames.append(data)
+
+    def log_lines(self):
+        """Return received log lines, skipping JSON stats/data frames"""
+        lines = []
+        for frame in self.frames:
+            if not frame.startswith(b"{"):
+                lines.extend(frame.decode("utf-8").split("\n"))
+        return lines
+
+
+async def wait_flushed():
+    """Give the flusher time to batch and send queued lines"""
+    await asyncio.sleep(server.LOG_FLUSH_INTERVAL * 5)
+
+
+class TestSessionLogBuffer:
+    """Test cases for SessionData log buffer truncation and replay"""
+
+    def test_truncation_keeps_recent_lines(self):
+        """Overflow drops the oldest whole lines and stays under the cap"""
+        session = server.SessionData(max_log_bytes=100)
+        for i in range(30):
+            session.append_log(f"line {i:02d}".encode())
+
+        lines = session.get_history_payload().split(b"\n")
+        # 8-byte lines under a 100-byte cap: trimming keeps roughly 7/8 of the cap
+        assert 10 <= len(lines) and len(session.logs) <= 100
+        assert lines[-1] == b"line 29"
+        assert lines == [f"line {i:02d}".encode() for i in range(30 - len(lines), 30)]
+
+    def test_truncation_keeps_oversized_newest_line(self):
+        """A line close to or above the cap replaces the buffer instead of wiping it"""
+        session = server.SessionData(max_log_bytes=100)
+        session.append_log(b"old")
+        session.append_log(b"x" * 150)
+
+        assert session.get_history_payload() == b"x" * 150
+
+    def test_history_payload_excludes_pending_lines(self):
+        """Lines still queued for the flusher are left out of the replay"""
+        session = server.SessionData()
+        assert session.get_history_payload() == b""
+
+        session.append_log(b"sent")
+        session.append_log(b"queued")
+        session.pending_log_bytes = len(b"queued") + 1
+        assert session.get_history_payload() == b"sent"
+
+        session.pending_log_bytes = len(session.logs)
+        assert session.get_history_payload() == b""
+
+
+class TestLogReplay:
+    """Test cases for history replay around the log flusher"""
+
+    @pytest.fixture
+    def manager(self):
+        return SessionManager()
+
+    @pytest.mark.asyncio
+    async def test_reconnect_while_lines_queued(self, manager):
+        """A socket joining while lines are queued gets each line exactly once"""
+        first = FakeWebSocket()
+        await manager.connect("s1", first)
+        await manager.safe_emit("s1", "a")
+        await wait_flushed()
+
+        await manager.safe_emit("s1", "b")
+        await manager.safe_emit("s1", "c")
+        second = FakeWebSocket()
+        await manager.connect("s1", second)
+        await wait_flushed()
+
+        assert first.log_lines() == ["a", "b", "c"]
+        assert second.log_lines() == ["a", "b", "c"]
+        assert manager.sessions["s1"].pending_log_bytes == 0
+
+        manager.disconnect("s1", first)
+        manager.disconnect("s1", second)
+
+    @pytest.mark.asyncio
+    async def test_flusher_restart_replays_unsent_lines(self, manager):
+        """Lines dropped from the queue on disconnect are replayed on the next connect"""
+        first = FakeWebSocket()
+        await manager.connect("s1", first)
+        await manager.safe_emit("s1", "a")
+        await manager.safe_emit("s1", "b")
+        manager.disconnect("s1", first)
+
+        session = manager.sessions["s1"]
+        assert session.flusher_task is None
+        assert session.pending_log_bytes == 0
+
+        await manager.safe_emit("s1", "c")
+        second = FakeWebSocket()
+        await manager.connect("s1", second)
+        await manager.safe_emit("s1", "d")
+        await wait_flushed()
+
+        assert first.log_lines() == []
+        assert second.log_lines() == ["a", "b", "c", "d"]
+        assert session.pending_log_bytes == 0
+
+        manager.disconnect("s1", second)
+
+    @pytest.mark.asyncio
+    async def test_failed_send_stops_flusher(self, manager):
+        """Losing the last socket on a failed send stops the flusher"""
+        websocket = FakeWebSocket()
+        await manager.connect("s1", websocket)
+        websocket.fail = True
+        await manager.safe_emit("s1", "a")
+        await wait_flushed()
+
+        session = manager.sessions["s1"]
+        assert not session.active_sockets
+        assert session.flusher_task is None
+        assert manager.total_active_sockets == 0
+
+
+class TestStatsFlush:
+    """Test cases for throttled stats pushes"""
+
+    @pytest.fixture
+    def manager(self):
+        return SessionManager()
+
+    @pytest.mark.asyncio
+    async def test_count_without_log_is_sent(self, manager):
+        """A count bump with no accompanying log line still reaches the socket"""
+        websocket = FakeWebSocket()
+        await manager.connect("s1", websocket)
+        await wait_flushed()
+
+        await manager.increment_count("s1")
+        await asyncio.sleep(server.STATS_FLUSH_INTERVAL * 2)
+
+        assert b'"crawled_count":1' in websocket.frames[-1]
+
+        manager.disconnect("s1", websocket)
+
+
+class TestWebSocketEndpoint:
+    """Test cases for the dashboard WebSocket endpoint"""
+
+    @pytest.fixture
+    def manager(self, monkeypatch):
+        manager = SessionManager()
+        monkeypatch.setattr(server, "manager", manager)
+        return manager
+
+    @pytest.mark.asyncio
+    async def test_failed_history_send_releases_socket(self, manager):
+        """A client dropping during the history replay is fully cleaned up"""
+        await manager.safe_emit("s1", "a")
+        websocket = FakeWebSocket(fail=True)
+
+        with pytest.raises(RuntimeError):
+            await server.websocket_endpoint(websocket, "s1")
+
+        session = manager.sessions["s1"]
+        assert not session.active_sockets
+        assert session.flusher_task is None
+        assert manager.total_active_sockets == 0
@@ -20,7 +20,7 @@
 
 from asyncio.tasks import Task
 from contextvars import ContextVar
-from typing import List
+from typing import Any, Awaitable, Callable, Dict, List, Optional
 
 import aiomysql
 
@@ -29,3 +29,6 @@ crawler_type_var: ContextVar[str] = ContextVar("crawler_type", default="")
 comment_tasks_var: ContextVar[List[Task]] = ContextVar("comment_tasks", default=[])
 db_conn_pool_var: ContextVar[aiomysql.Pool] = ContextVar("db_conn_pool_var")
 source_keyword_var: ContextVar[str] = ContextVar("source_keyword", default="")
+# 笔记入库回调（如 Web 控制台实时推送），接收笔记与实际存储函数，由回调决定何时存储及如何处理异常；按任务隔离，未设置时为 None
+NoteStoreFunc = Callable[[Dict[str, Any]], Awaitable[None]]
+note_update_callback_var: ContextVar[Optional[Callable[[Dict[str, Any], NoteStoreFunc], Awaitable[None]]]] = ContextVar("note_update_callback", default=None)